@@ -0,0 +1,339 @@
+import gc
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import tqdm
+import numpy as np
+import igraph as ig
+import search_methods  # minha implementação dos métodos de busca
+
+'''
+Suíte de benchmark para os métodos de busca sobre as instâncias salvas em data/.
+
+Diferente de main.time_test, cada medição:
+    executa algumas rodadas de aquecimento (warm-up) que são descartadas
+    usa time.perf_counter, que é monotônico e de maior resolução que time.time
+    roda com o coletor de lixo desligado (gc.collect() antes de cada execução)
+    fixa a semente do numpy antes de cada execução, de forma que o min_conflicts
+    percorra sempre os mesmos estados entre duas versões do código
+
+O resumo de cada método é a mediana dos tempos com intervalo de confiança por bootstrap.
+As amostras podem ser salvas como linha de base (baseline) e comparadas depois, indicando
+as regressões estatisticamente significativas para cada (n, k, método).
+'''
+
+# (identificador, método de busca, argumento), na mesma ordem das colunas usadas em main.run_tests
+METHODS = [('backtrack', search_methods.backtrack, ''),
+           ('forward checking', search_methods.backtrack, 'forward checking'),
+           ('MAC', search_methods.backtrack, 'MAC'),
+           ('min conflicts', search_methods.min_conflicts, '')]
+
+# assim como em main.run_tests, o backtrack simples só é executado nas instâncias pequenas
+MAX_N_BACKTRACK = 10
+
+BASELINE_FILE = 'data/benchmark_baseline.npz'
+
+
+# Método auxiliar, extrai o número de vértices a partir do nome do arquivo da instância
+def get_n(file):
+    return int(re.search(r'_(\d+)_\d+\.gml$', file).group(1))
+
+
+'''
+Mede o tempo, em segundos, de repeat execuções de um dado algoritmo de busca.
+A execução i usa a semente seed + i, e as rodadas de aquecimento usam sementes diferentes
+das medidas.
+Saída: uma tupla com (vetor de tempos, vetor indicando se foi encontrada solução válida)
+'''
+def measure(search_solution, g, k, arg=None, repeat=20, warmup=3, seed=0):
+    for i in range(warmup):
+        np.random.seed(seed + repeat + i)
+        search_solution(g, k, arg)
+
+    times = np.zeros(repeat)
+    results = np.zeros(repeat, dtype=bool)
+    gc_enabled = gc.isenabled()
+    try:
+        for i in range(repeat):
+            np.random.seed(seed + i)
+            gc.collect()
+            gc.disable()
+            t1 = time.perf_counter()
+            s = search_solution(g, k, arg)
+            t2 = time.perf_counter()
+            if gc_enabled:
+                gc.enable()
+            times[i] = t2 - t1
+            results[i] = s[0]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return times, results
+
+
+'''
+Intervalo de confiança por bootstrap (percentil) da mediana das amostras.
+Saída: uma tupla com (limite inferior, limite superior)
+'''
+def bootstrap_ci(samples, n_boot=10000, alpha=0.05, seed=0):
+    rng = np.random.default_rng(seed)  # gerador próprio para não alterar o estado global do numpy
+    samples = np.asarray(samples)
+    idxs = rng.integers(0, len(samples), (n_boot, len(samples)))
+    medians = np.median(samples[idxs], axis=1)
+    low, high = np.percentile(medians, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return low, high
+
+
+'''
+Intervalo de confiança por bootstrap da média geométrica, entre as instâncias, da razão
+current / baseline de cada instância.
+baseline e current são listas com um vetor de tempos por instância, na mesma ordem, e a posição i
+dos dois vetores de uma instância corresponde à mesma semente (ver measure). A razão de uma instância
+é a mediana das razões pareadas por semente, exp(mediana(log(current[i] / baseline[i]))), de forma que
+a variação do min_conflicts entre sementes não entra no intervalo, só o ruído da medição.
+Como cada instância contribui com a sua própria razão, uma regressão em qualquer uma delas altera o
+resultado, mesmo quando os tempos das instâncias diferem em ordens de grandeza.
+O bootstrap é estratificado: os pares de cada instância são reamostrados separadamente.
+Valores acima de 1 indicam que a versão atual é mais lenta.
+Saída: uma tupla com (razão observada, limite inferior, limite superior)
+'''
+def bootstrap_ratio_ci(baseline, current, n_boot=10000, alpha=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    observed = 0
+    log_ratios = np.zeros(n_boot)
+    for base, curr in zip(baseline, current):
+        pairs = np.log(np.asarray(curr) / np.asarray(base))  # exige o mesmo repeat nas duas execuções
+        observed += np.median(pairs)
+        log_ratios += np.median(pairs[rng.integers(0, len(pairs), (n_boot, len(pairs)))], axis=1)
+
+    observed /= len(baseline)
+    log_ratios /= len(baseline)
+    low, high = np.exp(np.percentile(log_ratios, [100 * alpha / 2, 100 * (1 - alpha / 2)]))
+    return np.exp(observed), low, high
+
+
+# Método auxiliar, média geométrica das medianas de cada instância
+def geometric_mean_median(times_list):
+    return np.exp(np.mean([np.log(np.median(times)) for times in times_list]))
+
+
+'''
+Executa todos os métodos de busca em todas as instâncias dadas, para cada valor de k.
+Saída: dicionário (k, nome da instância, método) -> (vetor de tempos, vetor de soluções válidas)
+'''
+def run_benchmark(files, ks=(3, 4), repeat=20, warmup=3, seed=0):
+    samples = dict()
+    for k in ks:
+        for file in tqdm.tqdm(files, desc='k = %d' % k):
+            g = ig.Graph.Read_GML(file)
+            name = os.path.basename(file)
+            for method, search_solution, arg in METHODS:
+                if method == 'backtrack' and get_n(file) > MAX_N_BACKTRACK:
+                    continue
+                samples[(k, name, method)] = measure(search_solution, g, k, arg, repeat, warmup, seed)
+
+    return samples
+
+
+# parâmetros da execução que são salvos junto da linha de base
+CONFIG_KEYS = ['repeat', 'warmup', 'seed', 'ks', 'max_n']
+
+
+'''
+As amostras são salvas em um único arquivo .npz, com chaves no formato "k|instância|método".
+Os parâmetros da execução (config, com as chaves de CONFIG_KEYS) são salvos com chaves "config|parâmetro".
+'''
+def save_samples(samples, config, path=BASELINE_FILE):
+    arrays = {'config|' + key: np.asarray(config[key]) for key in CONFIG_KEYS}
+    for (k, name, method), (times, results) in samples.items():
+        key = '%d|%s|%s' % (k, name, method)
+        arrays['times|' + key] = times
+        arrays['results|' + key] = results
+    # gravado por um arquivo aberto, para que o numpy não acrescente .npz ao nome dado
+    with open(path, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+
+
+'''
+Saída: uma tupla com (amostras no formato de run_benchmark, parâmetros da execução)
+'''
+def load_samples(path=BASELINE_FILE):
+    samples = dict()
+    config = dict()
+    with np.load(path) as data:
+        for key in data.files:
+            if key.startswith('config|'):
+                config[key.split('|')[1]] = data[key].tolist()
+                continue
+            kind, k, name, method = key.split('|')
+            if kind == 'times':
+                rest = '%s|%s|%s' % (k, name, method)
+                samples[(int(k), name, method)] = (data[key], data['results|' + rest])
+    return samples, config
+
+
+'''
+Salva os resumos no mesmo formato de main.run_tests (uma linha por instância, uma coluna por método),
+para que as curvas possam ser geradas com main.print_results(prefix=prefix, ci=True).
+O arquivo de "média" recebe a mediana, o de "desvio" o desvio padrão dos tempos e os limites
+do intervalo de confiança da mediana são salvos em curves_ci_low e curves_ci_high.
+'''
+def export_curves(samples, files, ks=(3, 4), prefix='data/bench_', n_boot=10000, alpha=0.05):
+    for k in ks:
+        median_time = np.full((len(files), len(METHODS)), np.nan)
+        std_time = np.full((len(files), len(METHODS)), np.nan)
+        ci_low = np.full((len(files), len(METHODS)), np.nan)
+        ci_high = np.full((len(files), len(METHODS)), np.nan)
+        results = np.full((len(files), len(METHODS)), np.nan)
+        for i, file in enumerate(files):
+            name = os.path.basename(file)
+            for j, (method, _, _) in enumerate(METHODS):
+                if (k, name, method) not in samples:
+                    continue
+                times, valid = samples[(k, name, method)]
+                median_time[i][j] = np.median(times)
+                std_time[i][j] = np.std(times)
+                ci_low[i][j], ci_high[i][j] = bootstrap_ci(times, n_boot, alpha)
+                results[i][j] = np.sum(valid)
+
+        np.savetxt(prefix + 'curves_average_time_%d.txt' % k, median_time, delimiter=',')
+        np.savetxt(prefix + 'curves_std_time_%d.txt' % k, std_time, delimiter=',')
+        np.savetxt(prefix + 'curves_ci_low_%d.txt' % k, ci_low, delimiter=',')
+        np.savetxt(prefix + 'curves_ci_high_%d.txt' % k, ci_high, delimiter=',')
+        np.savetxt(prefix + 'results_%d.txt' % k, results, delimiter=',')
+
+
+'''
+Compara as amostras atuais com a linha de base, agrupando as instâncias de mesmo tamanho.
+Cada combinação (n, k, método) é resumida pela média geométrica das razões pareadas por semente de cada
+instância (ver bootstrap_ratio_ci), e é marcada como regressão quando todo o intervalo de confiança
+está acima de 1 + min_effect, e como melhoria quando está todo abaixo de 1 - min_effect.
+Como cerca de 200 combinações são testadas em cada comparação, é aplicada a correção de Bonferroni:
+cada intervalo usa o nível alpha / (número de combinações comparadas), e a quantidade de réplicas do
+bootstrap é aumentada para que as caudas desse intervalo mais largo ainda tenham amostras suficientes.
+Só são usadas as instâncias presentes nas duas execuções; as demais são listadas como ausentes.
+Saída: uma tupla com
+    lista de tuplas (n, k, método, mediana base, mediana atual, razão, limite inferior, limite superior, status),
+    onde as medianas são médias geométricas das medianas de cada instância
+    lista de tuplas (n, k, método, instância, execução onde está ausente)
+'''
+def compare(baseline, current, min_effect=0.05, n_boot=10000, alpha=0.05):
+    def group(samples):
+        groups = dict()
+        for (k, name, method), (times, _) in samples.items():
+            groups.setdefault((get_n(name), k, method), dict())[name] = times
+        return groups
+
+    base_groups = group(baseline)
+    curr_groups = group(current)
+
+    missing = []
+    for key in sorted(set(base_groups) | set(curr_groups)):
+        base_names = set(base_groups.get(key, dict()))
+        curr_names = set(curr_groups.get(key, dict()))
+        missing += [key + (name, 'atual') for name in sorted(base_names - curr_names)]
+        missing += [key + (name, 'linha de base') for name in sorted(curr_names - base_names)]
+
+    keys = [key for key in sorted(set(base_groups) & set(curr_groups))
+            if len(set(base_groups[key]) & set(curr_groups[key])) > 0]
+    cell_alpha = alpha / max(len(keys), 1)
+    n_boot = max(n_boot, int(np.ceil(20 / cell_alpha)))  # ao menos ~10 réplicas em cada cauda
+
+    rows = []
+    for key in keys:
+        names = sorted(set(base_groups[key]) & set(curr_groups[key]))
+        base = [base_groups[key][name] for name in names]
+        curr = [curr_groups[key][name] for name in names]
+        ratio, low, high = bootstrap_ratio_ci(base, curr, n_boot, cell_alpha)
+        if low > 1 + min_effect:
+            status = 'REGRESSION'
+        elif high < 1 - min_effect:
+            status = 'improvement'
+        else:
+            status = ''
+        rows.append(key + (geometric_mean_median(base), geometric_mean_median(curr), ratio, low, high, status))
+
+    return rows, missing
+
+
+def print_comparison(rows, missing):
+    print('%5s %3s %-18s %12s %12s %7s %17s' % ('n', 'k', 'método', 'base (s)', 'atual (s)', 'razão', 'IC'))
+    for n, k, method, base, curr, ratio, low, high, status in rows:
+        print('%5d %3d %-18s %12.6f %12.6f %7.3f  [%6.3f, %6.3f] %s' %
+              (n, k, method, base, curr, ratio, low, high, status))
+
+    for n, k, method, name, side in missing:
+        print('aviso: n = %d, k = %d, %s: instância %s ausente na execução %s' % (n, k, method, name, side),
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    '''
+    Exemplos de uso:
+        python3 benchmark.py --save-baseline      # mede e salva a linha de base
+        python3 benchmark.py --compare            # mede a versão atual e compara com a linha de base
+        python3 benchmark.py --plot               # mede e gera as curvas com mediana e intervalo de confiança
+    Retorna código de saída 1 quando alguma regressão é encontrada no modo de comparação
+    e 2 quando nenhuma combinação (n, k, método) pôde ser comparada.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmark dos métodos de busca sobre as instâncias de data/.')
+    parser.add_argument('--repeat', type=int, default=20, help='execuções medidas por instância')
+    parser.add_argument('--warmup', type=int, default=3, help='execuções de aquecimento descartadas')
+    parser.add_argument('--seed', type=int, default=0, help='semente base do numpy para o min_conflicts')
+    parser.add_argument('--max-n', type=int, default=150, help='maior número de vértices considerado')
+    parser.add_argument('--k', type=int, nargs='+', default=[3, 4])
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--min-effect', type=float, default=0.05,
+                        help='variação relativa mínima da mediana para ser considerada significativa')
+    parser.add_argument('--plot', action='store_true')
+    args = parser.parse_args()
+
+    # a linha de base é carregada antes das medições, para não descobrir um caminho inválido só no final
+    config = {'repeat': args.repeat, 'warmup': args.warmup, 'seed': args.seed, 'ks': args.k, 'max_n': args.max_n}
+    baseline = None
+    if args.compare:
+        if not os.path.isfile(args.baseline):
+            parser.error('linha de base não encontrada: %s' % args.baseline)
+        baseline, baseline_config = load_samples(args.baseline)
+        # com outras sementes ou outra quantidade de execuções as amostras não são comparáveis
+        for key in ['repeat', 'warmup', 'seed']:
+            if baseline_config.get(key) != config[key]:
+                parser.error('a linha de base usa %s = %s, diferente de %s' %
+                             (key, baseline_config.get(key), config[key]))
+        if sorted(baseline_config.get('ks', [])) != sorted(config['ks']):
+            print('aviso: a linha de base usa k = %s, diferente de %s' % (baseline_config.get('ks'), config['ks']),
+                  file=sys.stderr)
+        # as instâncias acima do menor max_n das duas execuções ficam fora da comparação, sem aviso
+        compare_max_n = min(args.max_n, baseline_config.get('max_n', args.max_n))
+        baseline = {key: value for key, value in baseline.items() if get_n(key[1]) <= compare_max_n}
+
+    files = [f for f in sorted(glob.glob('data/*.gml')) if get_n(f) <= args.max_n]
+    samples = run_benchmark(files, args.k, args.repeat, args.warmup, args.seed)
+    export_curves(samples, files, args.k)
+
+    if args.save_baseline:
+        save_samples(samples, config, args.baseline)
+
+    status = 0
+    if args.compare:
+        current = {key: value for key, value in samples.items() if get_n(key[1]) <= compare_max_n}
+        rows, missing = compare(baseline, current, args.min_effect)
+        print_comparison(rows, missing)
+        if len(rows) == 0:
+            print('erro: nenhuma combinação (n, k, método) em comum com a linha de base', file=sys.stderr)
+            status = 2
+        elif any(row[-1] == 'REGRESSION' for row in rows):
+            status = 1
+
+    if args.plot:
+        import main
+        main.print_results(args.k, prefix='data/bench_', output='bench_curves_%d.pdf',
+                           ylabel='tempo mediano em segundos', ci=True)
+
+    sys.exit(status)
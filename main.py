@@ -16,10 +16,10 @@ def time_test(search_solution, g, k, arg=None):
     times = []
     results = []
     for _ in range(total):
-        t1 = time.time()
+        t1 = time.perf_counter()
         s = search_solution(g, k, arg)
         results.append(s[0])
-        t2 = time.time()
+        t2 = time.perf_counter()
         diff = t2 - t1
         times.append(diff)
 
@@ -100,28 +100,41 @@ def run_tests():
 
 '''
     Os plots são gerados considerando os arquivos de saída do método run_tests(). 
+    Com prefix='data/bench_' são usados os arquivos gerados por benchmark.export_curves().
+    Com ci=True as barras de erro são o intervalo de confiança (assimétrico) salvo em curves_ci_low
+    e curves_ci_high, em vez do desvio padrão.
 '''
-def print_results():
-    for k in [3, 4]:
-        mean_time = np.genfromtxt('data/test_curves_average_time_%d.txt' % k, delimiter=',')
-        std_time = np.genfromtxt('data/test_curves_std_time_%d.txt' % k, delimiter=',')
-        results = np.genfromtxt('data/test_results_%d.txt' % k, delimiter=',')
+def print_results(ks=(3, 4), prefix='data/test_', output='curves_%d.pdf', ylabel="tempo médio em segundos",
+                  ci=False):
+    for k in ks:
+        mean_time = np.genfromtxt(prefix + 'curves_average_time_%d.txt' % k, delimiter=',')
+        std_time = np.genfromtxt(prefix + 'curves_std_time_%d.txt' % k, delimiter=',')
+        results = np.genfromtxt(prefix + 'results_%d.txt' % k, delimiter=',')
+        if ci:
+            ci_low = np.genfromtxt(prefix + 'curves_ci_low_%d.txt' % k, delimiter=',')
+            ci_high = np.genfromtxt(prefix + 'curves_ci_high_%d.txt' % k, delimiter=',')
+
+        def get_yerr(idxs, j):
+            if ci:
+                # o matplotlib não aceita barras negativas, que podem surgir por arredondamento
+                return np.maximum([mean_time[idxs, j] - ci_low[idxs, j], ci_high[idxs, j] - mean_time[idxs, j]], 0)
+            return std_time[idxs, j]
 
         N = len(mean_time)
-        cut = 15
+        cut = min(15, N // 3)
         plt.figure(figsize=(8, 5))
         X = np.arange(5, 151, 5)[:cut]
 
         for i in range(3):
             idxs = np.arange(i, N, 3)[:cut]
 
-            plt.errorbar(X, mean_time[idxs, 0], c='red', marker='x', yerr=std_time[idxs, 0], alpha=0.5,
+            plt.errorbar(X, mean_time[idxs, 0], c='red', marker='x', yerr=get_yerr(idxs, 0), alpha=0.5,
                          label='backtrack')
-            plt.errorbar(X, mean_time[idxs, 1], c='blue', marker='x', yerr=std_time[idxs, 1], alpha=0.5,
+            plt.errorbar(X, mean_time[idxs, 1], c='blue', marker='x', yerr=get_yerr(idxs, 1), alpha=0.5,
                          label='backtrack forward checking')
-            plt.errorbar(X, mean_time[idxs, 2], c='purple', marker='x', yerr=std_time[idxs, 2], alpha=0.5,
+            plt.errorbar(X, mean_time[idxs, 2], c='purple', marker='x', yerr=get_yerr(idxs, 2), alpha=0.5,
                          label='backtrack MAC')
-            plt.errorbar(X, mean_time[idxs, 3], c='green', marker='x', yerr=std_time[idxs, 3], alpha=0.5,
+            plt.errorbar(X, mean_time[idxs, 3], c='green', marker='x', yerr=get_yerr(idxs, 3), alpha=0.5,
                          label='min conflicts')
 
         # source: https://stackoverflow.com/questions/13588920/stop-matplotlib-repeating-labels-in-legend
@@ -135,10 +148,10 @@ def print_results():
         plt.legend(handle_list, label_list, bbox_to_anchor=(1.01, 1.0))
         plt.title("k = %d" % k)
         plt.xlabel('número de vértices')
-        plt.ylabel("tempo médio em segundos")
+        plt.ylabel(ylabel)
         plt.grid()
         plt.tight_layout()
-        plt.savefig('curves_%d.pdf' % k)
+        plt.savefig(output % k)
         plt.show()
 
         # PARA IMPRIMIR A TABELA EM LATEX